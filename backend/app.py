@@ -1,14 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .database import engine, Base
-from . import routes
+from .database import engine, Base, SessionLocal
+from . import routes, db
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create tables on startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Populate head-to-head stats for results saved before the rivalry table existed
+    async with SessionLocal() as session:
+        await db.backfill_rivalries(session)
     yield
 
 app = FastAPI(title="Snake Royale Showdown - Mock Backend", lifespan=lifespan)
@@ -1,6 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import delete, insert, func, case, and_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import uuid
 import time
 from typing import Optional, List, Tuple
@@ -10,6 +12,9 @@ from . import models, schemas
 # In-memory token storage (for simplicity, could be Redis or DB table)
 TOKENS = {}
 
+# Maximum number of recent meetings returned by a rivalry lookup
+RIVALRY_RECENT_LIMIT = 10
+
 async def create_user(db: AsyncSession, username: str, email: str) -> models.User:
     user_id = str(uuid.uuid4())
     db_user = models.User(id=user_id, username=username, email=email)
@@ -40,10 +45,191 @@ async def save_game_result(db: AsyncSession, data: dict) -> models.GameResult:
     timestamp = int(time.time())
     result = models.GameResult(id=rid, timestamp=timestamp, **data)
     db.add(result)
+    # Write game_results first so a running rebuild blocks this save before it touches the rivalry row
+    await db.flush()
+    await _record_rivalry(db, result)
     await db.commit()
     await db.refresh(result)
     return result
 
+def _rivalry_key(player1: str, player2: str) -> Tuple[str, str]:
+    return min(player1, player2), max(player1, player2)
+
+def _dialect_insert(db: AsyncSession):
+    # Both dialects support INSERT ... ON CONFLICT DO UPDATE
+    if db.bind.dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+def _greatest(current, incoming):
+    # Portable GREATEST(): SQLite has no GREATEST and MAX() is an aggregate in Postgres
+    return case((incoming > current, incoming), else_=current)
+
+async def _upsert_rivalries(db: AsyncSession, rows: List[dict]):
+    # Counters are added in the database so concurrent saves for one pair never overwrite each other
+    if not rows:
+        return
+    rivalry = models.PlayerRivalry
+    stmt = _dialect_insert(db)(rivalry)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rivalry.playerA, rivalry.playerB],
+        set_={
+            "playerAWins": rivalry.playerAWins + excluded.playerAWins,
+            "playerBWins": rivalry.playerBWins + excluded.playerBWins,
+            "draws": rivalry.draws + excluded.draws,
+            "totalGames": rivalry.totalGames + excluded.totalGames,
+            "playerABestScore": _greatest(rivalry.playerABestScore, excluded.playerABestScore),
+            "playerBBestScore": _greatest(rivalry.playerBBestScore, excluded.playerBBestScore),
+        },
+    )
+    await db.execute(stmt, rows)
+
+def _rivalry_row(player1: str, player2: str, player1Wins: int, player2Wins: int, games: int,
+                 player1Best: int, player2Best: int) -> dict:
+    # Map player1/player2 stats onto the normalized A/B sides of the pair
+    player_a, player_b = _rivalry_key(player1, player2)
+    if player1 != player_a:
+        player1Wins, player2Wins = player2Wins, player1Wins
+        player1Best, player2Best = player2Best, player1Best
+    return {
+        "playerA": player_a,
+        "playerB": player_b,
+        "playerAWins": player1Wins,
+        "playerBWins": player2Wins,
+        "draws": games - player1Wins - player2Wins,
+        "totalGames": games,
+        "playerABestScore": player1Best,
+        "playerBBestScore": player2Best,
+    }
+
+async def _record_rivalry(db: AsyncSession, res: models.GameResult):
+    player_a, player_b = _rivalry_key(res.player1, res.player2)
+    player1_won = res.winner == res.player1
+    player2_won = res.winner == res.player2 and not player1_won
+    await _upsert_rivalries(db, [_rivalry_row(
+        res.player1, res.player2, int(player1_won), int(player2_won), 1,
+        res.player1Score, res.player2Score,
+    )])
+    db.add(models.RivalryGame(playerA=player_a, playerB=player_b, gameId=res.id))
+
+async def _aggregate_rivalries(db: AsyncSession) -> List[dict]:
+    res = models.GameResult
+    player2_won = and_(res.winner == res.player2, res.winner != res.player1)
+    per_order = await db.execute(
+        select(
+            res.player1,
+            res.player2,
+            func.sum(case((res.winner == res.player1, 1), else_=0)),
+            func.sum(case((player2_won, 1), else_=0)),
+            func.count(),
+            func.max(res.player1Score),
+            func.max(res.player2Score),
+        ).group_by(res.player1, res.player2)
+    )
+
+    # Fold the (a, b) and (b, a) groups into one normalized row per pair
+    rivalries = {}
+    for group in per_order.all():
+        row = _rivalry_row(*group)
+        key = (row["playerA"], row["playerB"])
+        if key not in rivalries:
+            rivalries[key] = row
+            continue
+        merged = rivalries[key]
+        for field in ("playerAWins", "playerBWins", "draws", "totalGames"):
+            merged[field] += row[field]
+        for field in ("playerABestScore", "playerBBestScore"):
+            merged[field] = max(merged[field], row[field])
+    return list(rivalries.values())
+
+async def rebuild_rivalries(db: AsyncSession) -> int:
+    # Recompute every rivalry row from game_results (e.g. to backfill or repair existing data).
+    # Saves are blocked until commit, otherwise a game committed between the aggregate and
+    # the reset would be wiped from its rivalry row.
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE game_results IN SHARE MODE"))
+    # On SQLite the DELETE opens the write transaction that holds other writers off
+    await db.execute(delete(models.PlayerRivalry))
+    await _upsert_rivalries(db, await _aggregate_rivalries(db))
+
+    # Index games that predate the pair index; existing entries keep their original order
+    res = models.GameResult
+    missing = (
+        select(res.id, res.player1, res.player2)
+        .outerjoin(models.RivalryGame, models.RivalryGame.gameId == res.id)
+        .where(models.RivalryGame.id.is_(None))
+        .order_by(res.timestamp, res.id)
+        .execution_options(yield_per=500)
+    )
+    stream = await db.stream(missing)
+    async for partition in stream.partitions():
+        entries = []
+        for game_id, player1, player2 in partition:
+            player_a, player_b = _rivalry_key(player1, player2)
+            entries.append({"playerA": player_a, "playerB": player_b, "gameId": game_id})
+        await db.execute(insert(models.RivalryGame), entries)
+
+    await db.commit()
+    count = await db.execute(select(func.count()).select_from(models.PlayerRivalry))
+    return count.scalar_one()
+
+async def backfill_rivalries(db: AsyncSession):
+    # Only rebuild when results exist but the rivalry table has never been populated
+    has_rivalries = await db.execute(select(models.PlayerRivalry.playerA).limit(1))
+    if has_rivalries.first() is not None:
+        return
+    has_results = await db.execute(select(models.GameResult.id).limit(1))
+    if has_results.first() is not None:
+        await rebuild_rivalries(db)
+
+async def get_rivalry(db: AsyncSession, username: str, opponent: str, limit: int = 5) -> schemas.RivalryStats:
+    player_a, player_b = _rivalry_key(username, opponent)
+    rivalry = await db.get(models.PlayerRivalry, (player_a, player_b))
+    if rivalry is None:
+        return schemas.RivalryStats(
+            username=username,
+            opponent=opponent,
+            wins=0,
+            losses=0,
+            draws=0,
+            totalGames=0,
+            bestScore=0,
+            opponentBestScore=0,
+            recentGames=[],
+        )
+
+    recent = await db.execute(
+        select(models.GameResult)
+        .join(models.RivalryGame, models.RivalryGame.gameId == models.GameResult.id)
+        .where(models.RivalryGame.playerA == player_a, models.RivalryGame.playerB == player_b)
+        .order_by(models.RivalryGame.id.desc())
+        .limit(limit)
+    )
+
+    # Present the normalized row from the requesting player's point of view
+    if username == rivalry.playerA:
+        wins, losses = rivalry.playerAWins, rivalry.playerBWins
+        best, opponent_best = rivalry.playerABestScore, rivalry.playerBBestScore
+    else:
+        wins, losses = rivalry.playerBWins, rivalry.playerAWins
+        best, opponent_best = rivalry.playerBBestScore, rivalry.playerABestScore
+
+    return schemas.RivalryStats(
+        username=username,
+        opponent=opponent,
+        wins=wins,
+        losses=losses,
+        draws=rivalry.draws,
+        totalGames=rivalry.totalGames,
+        bestScore=best,
+        opponentBestScore=opponent_best,
+        recentGames=[
+            schemas.GameResult.model_validate(game, from_attributes=True)
+            for game in recent.scalars().all()
+        ],
+    )
+
 async def get_leaderboard(db: AsyncSession) -> List[schemas.LeaderboardEntry]:
     # Calculate leaderboard from game results
     result = await db.execute(select(models.GameResult))
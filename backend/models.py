@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, JSON
+from sqlalchemy import Column, Integer, String, Boolean, Float, JSON, Index
 from .database import Base
 
 class User(Base):
@@ -23,6 +23,31 @@ class GameResult(Base):
     timestamp = Column(Integer)
 
 
+class PlayerRivalry(Base):
+    __tablename__ = "player_rivalries"
+
+    # Normalized pair: playerA is always min(player1, player2), playerB the max
+    playerA = Column(String, primary_key=True)
+    playerB = Column(String, primary_key=True)
+    playerAWins = Column(Integer, default=0)
+    playerBWins = Column(Integer, default=0)
+    draws = Column(Integer, default=0)
+    totalGames = Column(Integer, default=0)
+    playerABestScore = Column(Integer, default=0)
+    playerBBestScore = Column(Integer, default=0)
+
+
+class RivalryGame(Base):
+    __tablename__ = "rivalry_games"
+    # Pair index over game_results: last N meetings is a LIMIT scan of this index
+    __table_args__ = (Index("ix_rivalry_games_pair", "playerA", "playerB", "id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # Monotonic insertion order
+    playerA = Column(String)
+    playerB = Column(String)
+    gameId = Column(String, unique=True)
+
+
 class GameRoom(Base):
     __tablename__ = "game_rooms"
 
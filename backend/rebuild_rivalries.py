@@ -0,0 +1,18 @@
+"""Recompute head-to-head rivalry stats from game_results. Run with `python -m backend.rebuild_rivalries`."""
+import asyncio
+
+from .database import engine, Base, SessionLocal
+from . import db
+
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        count = await db.rebuild_rivalries(session)
+    await engine.dispose()
+    print(f"Rebuilt {count} rivalries")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
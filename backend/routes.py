@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from . import db, schemas, database, models
@@ -91,6 +91,16 @@ async def leaderboard(session: AsyncSession = Depends(get_db_session)):
     return await db.get_leaderboard(session)
 
 
+@router.get("/players/{username}/vs/{opponent}", response_model=schemas.RivalryStats)
+async def rivalry(
+    username: str,
+    opponent: str,
+    limit: int = Query(5, ge=1, le=db.RIVALRY_RECENT_LIMIT),
+    session: AsyncSession = Depends(get_db_session)
+):
+    return await db.get_rivalry(session, username, opponent, limit)
+
+
 @router.get("/live-games", response_model=List[schemas.LiveGame])
 async def live_games(session: AsyncSession = Depends(get_db_session)):
     return await db.get_live_games(session)
@@ -59,6 +59,18 @@ class LeaderboardEntry(BaseModel):
     winRate: float
 
 
+class RivalryStats(BaseModel):
+    username: str
+    opponent: str
+    wins: int
+    losses: int
+    draws: int
+    totalGames: int
+    bestScore: int
+    opponentBestScore: int
+    recentGames: List[GameResult]
+
+
 class LiveGame(BaseModel):
     id: str
     player1: str
@@ -0,0 +1,191 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from backend.app import app
+from backend.database import Base
+from backend import db, models, routes
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    # Fresh database per test so counts never depend on earlier runs
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'rivalry.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+    await engine.dispose()
+
+
+def game(player1, player2, winner, player1Score, player2Score):
+    return {
+        "player1": player1,
+        "player2": player2,
+        "winner": winner,
+        "player1Score": player1Score,
+        "player2Score": player2Score,
+        "mode": "walls",
+        "duration": 60,
+    }
+
+
+async def save_all(session_factory, games):
+    for data in games:
+        async with session_factory() as session:
+            await db.save_game_result(session, data)
+
+
+@pytest.mark.asyncio
+async def test_rivalry_counts_from_both_sides(session_factory):
+    await save_all(session_factory, [
+        game("Zed", "Amy", "Zed", 7, 2),
+        game("Amy", "Zed", "Amy", 9, 4),
+        game("Amy", "Zed", "Draw", 3, 3),
+        game("Zed", "Amy", "Game Over", 1, 0),
+    ])
+
+    async with session_factory() as session:
+        stats = await db.get_rivalry(session, "Zed", "Amy", limit=3)
+        assert (stats.wins, stats.losses, stats.draws, stats.totalGames) == (1, 1, 2, 4)
+        assert (stats.bestScore, stats.opponentBestScore) == (7, 9)
+        assert [g.winner for g in stats.recentGames] == ["Game Over", "Draw", "Amy"]
+
+        other = await db.get_rivalry(session, "Amy", "Zed")
+        assert (other.wins, other.losses, other.draws) == (1, 1, 2)
+        assert other.bestScore == 9
+
+        empty = await db.get_rivalry(session, "Amy", "Nobody")
+        assert empty.totalGames == 0
+        assert empty.recentGames == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental(session_factory):
+    # Saved within the same second, so only the pair index preserves their order
+    await save_all(session_factory, [
+        game("Zed", "Amy", "Zed", 7, 2),
+        game("Amy", "Zed", "Amy", 9, 4),
+        game("Amy", "Zed", "Draw", 3, 3),
+        game("Bob", "Amy", "Bob", 5, 1),
+    ])
+
+    async with session_factory() as session:
+        live = await db.get_rivalry(session, "Amy", "Zed", limit=10)
+        assert await db.rebuild_rivalries(session) == 2
+        rebuilt = await db.get_rivalry(session, "Amy", "Zed", limit=10)
+        assert rebuilt == live
+
+
+@pytest.mark.asyncio
+async def test_rebuild_indexes_existing_results(session_factory):
+    # Results written before the rivalry tables existed
+    async with session_factory() as session:
+        for i, (winner, s1, s2) in enumerate([("P", 3, 1), ("Q", 2, 6), ("Draw", 4, 4)]):
+            session.add(models.GameResult(id=f"g{i}", timestamp=100 + i, **game("P", "Q", winner, s1, s2)))
+        await session.commit()
+
+        await db.backfill_rivalries(session)
+        stats = await db.get_rivalry(session, "Q", "P", limit=10)
+        assert (stats.wins, stats.losses, stats.draws, stats.totalGames) == (1, 1, 1, 3)
+        assert [g.id for g in stats.recentGames] == ["g2", "g1", "g0"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_is_noop_when_rows_exist(session_factory):
+    await save_all(session_factory, [game("P", "Q", "P", 3, 1)])
+
+    async with session_factory() as session:
+        # A result without a rivalry row shows whether backfill rebuilt anything
+        session.add(models.GameResult(id="legacy", timestamp=1, **game("X", "Y", "X", 1, 0)))
+        await session.commit()
+
+        await db.backfill_rivalries(session)
+        assert (await db.get_rivalry(session, "X", "Y")).totalGames == 0
+
+        await db.rebuild_rivalries(session)
+        assert (await db.get_rivalry(session, "X", "Y")).totalGames == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_keep_counts(session_factory):
+    async def save(data):
+        async with session_factory() as session:
+            return await db.save_game_result(session, data)
+
+    # First meetings for a new pair arrive together, then more for the same pair
+    await asyncio.gather(*[save(game("P", "Q", "P", i, 0)) for i in range(5)])
+    await asyncio.gather(*[save(game("Q", "P", "Draw", 0, i)) for i in range(10)])
+
+    async with session_factory() as session:
+        saved = await session.execute(select(func.count()).select_from(models.GameResult))
+        assert saved.scalar_one() == 15
+
+        stats = await db.get_rivalry(session, "P", "Q")
+        assert (stats.wins, stats.draws, stats.totalGames) == (5, 10, 15)
+        assert stats.bestScore == 9
+
+
+@pytest.mark.asyncio
+async def test_save_during_rebuild_is_counted(session_factory, monkeypatch):
+    await save_all(session_factory, [game("P", "Q", "P", 3, 1), game("Q", "P", "Q", 5, 2)])
+
+    async def save():
+        async with session_factory() as session:
+            return await db.save_game_result(session, game("P", "Q", "Draw", 4, 4))
+
+    # Race a save against the rebuild right after it has read the aggregate
+    original = db._aggregate_rivalries
+    pending = []
+
+    async def aggregate_with_concurrent_save(session):
+        rows = await original(session)
+        pending.append(asyncio.create_task(save()))
+        await asyncio.sleep(0.2)
+        return rows
+
+    monkeypatch.setattr(db, "_aggregate_rivalries", aggregate_with_concurrent_save)
+    async with session_factory() as session:
+        await db.rebuild_rivalries(session)
+    saved = await pending[0]
+
+    async with session_factory() as session:
+        stats = await db.get_rivalry(session, "P", "Q", limit=10)
+        assert (stats.wins, stats.losses, stats.draws, stats.totalGames) == (1, 1, 1, 3)
+        assert stats.recentGames[0].id == saved.id
+
+
+@pytest.mark.asyncio
+async def test_rivalry_endpoint(session_factory):
+    await save_all(session_factory, [
+        game("Zed", "Amy", "Zed", 7, 2),
+        game("Amy", "Zed", "Amy", 9, 4),
+    ])
+
+    async def override_get_db_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[routes.get_db_session] = override_get_db_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            r = await ac.get("/players/Amy/vs/Zed", params={"limit": 1})
+            assert r.status_code == 200
+            stats = r.json()
+            assert stats["username"] == "Amy"
+            assert (stats["wins"], stats["losses"], stats["draws"], stats["totalGames"]) == (1, 1, 0, 2)
+            assert (stats["bestScore"], stats["opponentBestScore"]) == (9, 7)
+            assert len(stats["recentGames"]) == 1
+            assert stats["recentGames"][0]["winner"] == "Amy"
+            assert stats["recentGames"][0]["mode"] == "walls"
+
+            for limit in (0, db.RIVALRY_RECENT_LIMIT + 1):
+                r = await ac.get("/players/Amy/vs/Zed", params={"limit": limit})
+                assert r.status_code == 422
+    finally:
+        app.dependency_overrides.pop(routes.get_db_session, None)